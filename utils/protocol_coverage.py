@@ -7,48 +7,121 @@ coverage statistics, and validation status.
 """
 
 import json
+import mmap
+import re
 import sys
 import os
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from pathlib import Path
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj):
+        """Serialize to indented JSON bytes"""
+        return json.dumps(obj, indent=2).encode()
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Matches Protocol: "xyz" fields in Go source
+_PROTOCOL_RE = re.compile(r'Protocol:\s*"([^"]+)"')
 
 
 class ProtocolCoverageAnalyzer:
     """Analyzes protocol coverage in proxy configurations"""
 
-    SUPPORTED_PROTOCOLS = {"vmess", "vless", "trojan", "ss", "ssr", "reality", "xhttp"}
+    SUPPORTED_PROTOCOLS = frozenset({"vmess", "vless", "trojan", "ss", "ssr", "reality", "xhttp"})
+
+    # Fields every config of a given protocol must set
+    _REQUIRED_FIELDS = {
+        "vmess": ("UUID", "Server", "Port"),
+        "vless": ("UUID", "Server", "Port"),
+        "trojan": ("Password", "Server", "Port"),
+        "ss": ("Password", "Cipher", "Server", "Port"),
+        "ssr": ("Password", "Cipher", "Server", "Port"),
+        "reality": ("PublicKey", "ShortID", "Server", "Port"),
+        "xhttp": ("HTTPMethod", "HTTPHost", "Server", "Port"),
+    }
+
+    # Matches any supported "<proto>://" scheme in one pass over the buffer
+    _SCHEME_RE = re.compile(
+        ("(" + "|".join(sorted(SUPPORTED_PROTOCOLS, key=len, reverse=True)) + ")://").encode()
+    )
+
+    # Below this many files the process pool startup costs more than it saves
+    PARALLEL_THRESHOLD = 16
+
+    # Text files larger than this are scanned through mmap instead of read()
+    MMAP_THRESHOLD = 1 << 20
 
     def __init__(self, config_files):
         self.config_files = config_files
+        self.timestamp = datetime.now().isoformat()
         self.configs = []
-        self.protocol_stats = defaultdict(int)
+        self.protocol_stats = Counter()
         self.validation_results = {
             "total": 0,
             "valid": 0,
             "invalid": 0,
             "warnings": [],
         }
+        # Memoized report and coverage denominator, reset whenever stats change
+        self._report_cache = None
+        self._total_protocols = None
 
-    def analyze_configs(self):
+    def analyze_configs(self, max_workers=None):
         """Analyze all configuration files"""
-        for config_file in self.config_files:
-            try:
-                if config_file.endswith(".json"):
-                    self._load_json_config(config_file)
-                elif config_file.endswith(".go"):
-                    self._parse_go_config(config_file)
-                else:
-                    self._parse_text_config(config_file)
-            except Exception as e:
-                self.validation_results["warnings"].append(
-                    f"Error processing {config_file}: {str(e)}"
-                )
+        self._invalidate_report()
+        if len(self.config_files) < self.PARALLEL_THRESHOLD:
+            for config_file in self.config_files:
+                self._analyze_file(config_file)
+            return
+
+        # Files are independent, so fan them out and merge results in order
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for stats, configs, warnings in executor.map(
+                _analyze_file, self.config_files, chunksize=8
+            ):
+                self.protocol_stats.update(stats)
+                self.configs.extend(configs)
+                self.validation_results["warnings"].extend(warnings)
+
+    def _analyze_file(self, config_file):
+        """Analyze a single configuration file"""
+        try:
+            if config_file.endswith(".json"):
+                self._load_json_config(config_file)
+            elif config_file.endswith(".go"):
+                self._parse_go_config(config_file)
+            else:
+                self._parse_text_config(config_file)
+        except Exception as e:
+            self.validation_results["warnings"].append(
+                f"Error processing {config_file}: {str(e)}"
+            )
 
     def _load_json_config(self, filepath):
         """Load JSON config file"""
         try:
-            with open(filepath, "r") as f:
+            with open(filepath, "rb") as f:
+                # Stream top-level arrays item by item instead of
+                # materializing the whole document first; items are only
+                # kept once the whole file has parsed
+                if ijson is not None and f.read(64).lstrip().startswith(b"["):
+                    f.seek(0)
+                    items = list(ijson.items(f, "item", use_float=True))
+                    self.configs.extend(items)
+                    return
+
+                f.seek(0)
                 data = json.load(f)
 
             if isinstance(data, list):
@@ -66,16 +139,13 @@ class ProtocolCoverageAnalyzer:
             with open(filepath, "r") as f:
                 content = f.read()
 
-            # Look for Protocol fields in Go code
-            import re
-
             # Find all Protocol = "xyz" assignments
-            protocol_pattern = r'Protocol:\s*"([^"]+)"'
-            matches = re.findall(protocol_pattern, content)
-
-            for match in matches:
-                if match.lower() in self.SUPPORTED_PROTOCOLS:
-                    self.protocol_stats[match.lower()] += 1
+            supported = self.SUPPORTED_PROTOCOLS
+            self.protocol_stats.update(
+                protocol
+                for protocol in map(str.lower, _PROTOCOL_RE.findall(content))
+                if protocol in supported
+            )
         except Exception as e:
             self.validation_results["warnings"].append(
                 f"Failed to parse Go config {filepath}: {str(e)}"
@@ -84,14 +154,17 @@ class ProtocolCoverageAnalyzer:
     def _parse_text_config(self, filepath):
         """Parse text-based config file (subscription lists)"""
         try:
-            with open(filepath, "r") as f:
-                content = f.read()
+            with open(filepath, "rb") as f:
+                if os.fstat(f.fileno()).st_size > self.MMAP_THRESHOLD:
+                    # Scan the page cache directly rather than copying the file
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        schemes = Counter(self._SCHEME_RE.findall(content))
+                else:
+                    schemes = Counter(self._SCHEME_RE.findall(f.read()))
 
             # Count protocol occurrences
-            for protocol in self.SUPPORTED_PROTOCOLS:
-                count = content.count(f"{protocol}://")
-                if count > 0:
-                    self.protocol_stats[protocol] += count
+            for scheme, count in schemes.items():
+                self.protocol_stats[scheme.decode()] += count
         except Exception as e:
             self.validation_results["warnings"].append(
                 f"Failed to parse text config {filepath}: {str(e)}"
@@ -99,6 +172,7 @@ class ProtocolCoverageAnalyzer:
 
     def validate_protocols(self):
         """Validate protocol usage"""
+        self._invalidate_report()
         self.validation_results["total"] = len(self.configs)
 
         for config in self.configs:
@@ -131,31 +205,35 @@ class ProtocolCoverageAnalyzer:
                     [f"Config validation issues: {', '.join(issues)}"]
                 )
 
+        self._total_protocols = sum(self.protocol_stats.values())
+
+    def _invalidate_report(self):
+        """Drop the memoized report after the underlying stats change"""
+        self._report_cache = None
+        self._total_protocols = None
+
     def _validate_protocol_fields(self, config, protocol, issues):
         """Validate required fields for each protocol"""
         if not isinstance(config, dict):
             return
 
-        required_fields = {
-            "vmess": ["UUID", "Server", "Port"],
-            "vless": ["UUID", "Server", "Port"],
-            "trojan": ["Password", "Server", "Port"],
-            "ss": ["Password", "Cipher", "Server", "Port"],
-            "ssr": ["Password", "Cipher", "Server", "Port"],
-            "reality": ["PublicKey", "ShortID", "Server", "Port"],
-            "xhttp": ["HTTPMethod", "HTTPHost", "Server", "Port"],
-        }
+        fields = self._REQUIRED_FIELDS.get(protocol)
+        if fields is None:
+            return
 
-        if protocol in required_fields:
-            for field in required_fields[protocol]:
-                if not config.get(field):
-                    issues.append(f"Missing required field: {field}")
+        get = config.get
+        for field in fields:
+            if not get(field):
+                issues.append(f"Missing required field: {field}")
 
     def generate_report(self):
-        """Generate coverage report"""
+        """Generate coverage report (built once per analysis run)"""
+        if self._report_cache is not None:
+            return self._report_cache
+
         report = {
             "title": "Protocol Coverage Report",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self.timestamp,
             "summary": {
                 "total_configurations": self.validation_results["total"],
                 "valid_configurations": self.validation_results["valid"],
@@ -166,6 +244,7 @@ class ProtocolCoverageAnalyzer:
             "validation_details": self._get_validation_details(),
         }
 
+        self._report_cache = report
         return report
 
     def _calculate_coverage(self):
@@ -173,7 +252,9 @@ class ProtocolCoverageAnalyzer:
         if not self.protocol_stats:
             return {}
 
-        total = sum(self.protocol_stats.values())
+        total = self._total_protocols
+        if total is None:
+            total = self._total_protocols = sum(self.protocol_stats.values())
         coverage = {}
 
         for protocol in self.SUPPORTED_PROTOCOLS:
@@ -271,8 +352,8 @@ class ProtocolCoverageAnalyzer:
     def export_json(self, filepath):
         """Export report to JSON"""
         report = self.generate_report()
-        with open(filepath, "w") as f:
-            json.dump(report, f, indent=2)
+        with open(filepath, "wb") as f:
+            f.write(_dumps(report))
         print(f"Report exported to {filepath}")
 
     def export_csv(self, filepath):
@@ -285,15 +366,29 @@ class ProtocolCoverageAnalyzer:
         print(f"CSV report exported to {filepath}")
 
 
+def _analyze_file(config_file):
+    """Analyze one file in a worker process and return its partial results"""
+    analyzer = ProtocolCoverageAnalyzer([config_file])
+    analyzer._analyze_file(config_file)
+    return (
+        dict(analyzer.protocol_stats),
+        analyzer.configs,
+        analyzer.validation_results["warnings"],
+    )
+
+
 def find_config_files(directory="."):
     """Find all config files in a directory"""
     config_files = []
-    extensions = {"*.json", "*.go", "*.txt", "*.yaml", "*.yml"}
+    extensions = (".json", ".go", ".txt", ".yaml", ".yml")
 
-    for ext in extensions:
-        config_files.extend(Path(directory).glob(f"**/{ext}"))
+    # Single walk over the tree, matching every extension at once
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(extensions):
+                config_files.append(os.path.join(root, name))
 
-    return [str(f) for f in config_files]
+    return config_files
 
 
 def main():
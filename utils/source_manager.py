@@ -9,14 +9,32 @@ import json
 import asyncio
 import aiohttp
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import base64
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+try:
+    import xxhash
+
+    def _line_hash(line: str) -> int:
+        return xxhash.xxh3_64_intdigest(line.encode())
+except ImportError:
+    _line_hash = hash
+
 
 logger = logging.getLogger(__name__)
 
+# Parsed source entries keyed by (path, st_mtime_ns, st_size)
+_SOURCES_CACHE: Dict[Tuple[str, int, int], List[Dict]] = {}
+
 
 class ConfigSource:
     """Represents a proxy configuration source"""
@@ -46,22 +64,40 @@ class ConfigSource:
 class SourceManager:
     """Manages proxy configuration sources"""
 
+    # Upper bound on sources fetched at the same time
+    MAX_CONCURRENT_FETCHES = 32
+
     def __init__(self, sources_file: Path):
         self.sources_file = sources_file
         self.sources: List[ConfigSource] = []
+        # Conditional-GET cache: url -> {etag, last_modified, body, fetched_at}
+        self._http_cache_file = Path(sources_file).parent / '.sources_http_cache.json'
+        self._http_cache: Dict[str, Dict] = {}
+        # to_dict() of every source as last read from or written to disk,
+        # None while the file has not been loaded or saved successfully
+        self._saved: Optional[List[Dict]] = None
         self.load_sources()
+        self._load_http_cache()
 
     def load_sources(self) -> None:
         """Load sources from configuration file"""
         try:
-            with open(self.sources_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            st = os.stat(self.sources_file)
+            key = (str(self.sources_file), st.st_mtime_ns, st.st_size)
+
+            source_configs = _SOURCES_CACHE.get(key)
+            if source_configs is None:
+                with open(self.sources_file, 'r', encoding='utf-8') as f:
+                    config = yaml.load(f, Loader=SafeLoader)
+
+                if not config or 'sources' not in config:
+                    logger.warning("No sources found in configuration")
+                    return
 
-            if not config or 'sources' not in config:
-                logger.warning("No sources found in configuration")
-                return
+                source_configs = config['sources']
+                _SOURCES_CACHE[key] = source_configs
 
-            for source_config in config['sources']:
+            for source_config in source_configs:
                 source = ConfigSource(
                     name=source_config['name'],
                     url=source_config['url'],
@@ -72,6 +108,7 @@ class SourceManager:
                 )
                 self.sources.append(source)
 
+            self._saved = [source.to_dict() for source in self.sources]
             logger.info(f"Loaded {len(self.sources)} sources")
 
         except Exception as e:
@@ -79,19 +116,43 @@ class SourceManager:
 
     def save_sources(self) -> None:
         """Save sources to configuration file"""
+        # Comparing against the last on-disk state also catches sources
+        # edited in place, e.g. through get_source()
+        current = [source.to_dict() for source in self.sources]
+        if current == self._saved and os.path.exists(self.sources_file):
+            logger.debug("Sources unchanged, skipping save")
+            return
+
         try:
-            config = {
-                'sources': [source.to_dict() for source in self.sources]
-            }
+            config = {'sources': current}
 
             with open(self.sources_file, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False)
+                yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False)
 
+            self._saved = current
             logger.info(f"Saved {len(self.sources)} sources")
 
         except Exception as e:
             logger.error(f"Error saving sources: {e}")
 
+    def _load_http_cache(self) -> None:
+        """Load the HTTP response cache persisted next to the sources file"""
+        try:
+            with open(self._http_cache_file, 'r', encoding='utf-8') as f:
+                self._http_cache = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable HTTP cache: {e}")
+
+    def _save_http_cache(self) -> None:
+        """Persist the HTTP response cache"""
+        try:
+            with open(self._http_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self._http_cache, f)
+        except Exception as e:
+            logger.error(f"Error saving HTTP cache: {e}")
+
     def add_source(self, name: str, url: str, source_type: str,
                    enabled: bool = True, timeout: int = 30, interval: int = 360) -> None:
         """Add a new source"""
@@ -115,29 +176,50 @@ class SourceManager:
         """Get all enabled sources"""
         return [s for s in self.sources if s.enabled]
 
-    async def fetch_from_source(self, source: ConfigSource) -> Optional[List[str]]:
-        """Fetch configurations from a single source"""
+    async def fetch_from_source(self, session: aiohttp.ClientSession,
+                                source: ConfigSource) -> Optional[List[str]]:
+        """Fetch configurations from a single source using a shared session"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(source.url, timeout=source.timeout) as response:
-                    if response.status != 200:
-                        logger.warning(f"Failed to fetch from {source.name}: HTTP {response.status}")
-                        return None
-
-                    content = await response.text()
+            cached = self._http_cache.get(source.url)
+            now = time.time()
+
+            if cached and now - cached.get('fetched_at', 0) < source.interval * 60:
+                # Still fresh for this source's update interval: skip the request
+                logger.debug(f"Using cached body for {source.name}")
+                return self._parse_content(source, cached['body'], cached['fetched_at'])
+
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+
+            timeout = aiohttp.ClientTimeout(total=source.timeout)
+            async with session.get(source.url, headers=headers, timeout=timeout) as response:
+                if response.status == 304 and cached:
+                    logger.debug(f"{source.name} not modified since last fetch")
+                    configs = self._parse_content(source, cached['body'], now)
+                    cached['fetched_at'] = now
+                    return configs
 
-                    # Parse based on source type
-                    if source.type == 'base64':
-                        content = base64.b64decode(content).decode('utf-8')
+                if response.status != 200:
+                    logger.warning(f"Failed to fetch from {source.name}: HTTP {response.status}")
+                    return None
 
-                    # Split by newlines to get individual configs
-                    configs = [line.strip() for line in content.split('\n') if line.strip()]
+                content = await response.text()
+                # Parse before caching so a body that fails to decode is
+                # fetched again next time instead of being served from cache
+                configs = self._parse_content(source, content, now)
 
-                    source.config_count = len(configs)
-                    source.last_updated = datetime.now()
+                self._http_cache[source.url] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'body': content,
+                    'fetched_at': now,
+                }
 
-                    logger.info(f"Fetched {len(configs)} configs from {source.name}")
-                    return configs
+                return configs
 
         except asyncio.TimeoutError:
             logger.error(f"Timeout fetching from {source.name}")
@@ -146,20 +228,83 @@ class SourceManager:
             logger.error(f"Error fetching from {source.name}: {e}")
             return None
 
+    def _parse_content(self, source: ConfigSource, content: str,
+                       fetched_at: float) -> List[str]:
+        """Split a source response body into individual configs
+
+        fetched_at is when the body was last confirmed by the server, which
+        for a cached body is earlier than now.
+        """
+        # Parse based on source type
+        if source.type == 'base64':
+            content = base64.b64decode(content).decode('utf-8')
+
+        # Split by newlines to get individual configs; repeats are dropped
+        # once, across all sources, by _dedupe_across_sources
+        configs = list(filter(None, map(str.strip, content.splitlines())))
+
+        source.config_count = len(configs)
+        source.last_updated = datetime.fromtimestamp(fetched_at)
+
+        logger.info(f"Fetched {len(configs)} configs from {source.name}")
+        return configs
+
     async def fetch_all_sources(self) -> Dict[str, List[str]]:
-        """Fetch configurations from all enabled sources"""
+        """Fetch configurations from all enabled sources
+
+        Sources that failed or returned no configs are left out. A source
+        whose configs all duplicate an earlier source's is kept with an
+        empty list.
+        """
         results = {}
         sources = self.get_enabled_sources()
 
-        tasks = [self.fetch_from_source(source) for source in sources]
-        responses = await asyncio.gather(*tasks)
+        # One pooled session for every source: connections and DNS lookups
+        # are reused instead of paying a fresh TCP/TLS handshake per URL
+        connector = aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+
+        async def fetch(session, source):
+            async with semaphore:
+                return source.name, await self.fetch_from_source(session, source)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [fetch(session, source) for source in sources]
+            for completed in asyncio.as_completed(tasks):
+                name, configs = await completed
+                if configs:
+                    results[name] = configs
 
-        for source, configs in zip(sources, responses):
-            if configs:
-                results[source.name] = configs
+        self._save_http_cache()
 
         logger.info(f"Fetched configs from {len(results)}/{len(sources)} sources")
-        return results
+        return self._dedupe_across_sources(sources, results)
+
+    @staticmethod
+    def _dedupe_across_sources(sources: List[ConfigSource],
+                               results: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Drop configs already returned by this or an earlier source
+
+        Each line is hashed exactly once here. Runs after every fetch has finished and walks the sources in their
+        configured order, so which source keeps a shared config does not
+        depend on which request completed first.
+        """
+        seen: Set[int] = set()
+        deduped = {}
+        for source in sources:
+            configs = results.get(source.name)
+            if not configs:
+                continue
+
+            unique = []
+            for line in configs:
+                h = _line_hash(line)
+                if h not in seen:
+                    seen.add(h)
+                    unique.append(line)
+            deduped[source.name] = unique
+
+        return deduped
 
     def get_source_status(self) -> Dict:
         """Get status of all sources"""
@@ -5,11 +5,164 @@ Validates sources, rules, and obfuscation configurations
 """
 
 import json
+import functools
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Type
 import sys
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Item schemas: required fields (checked as one subset test, then reported
+# in schema order by _check_source/_check_rule) and allowed enum values
+_SOURCE_REQUIRED = frozenset(('name', 'url', 'type', 'enabled'))
+_SOURCE_TYPES = frozenset(('base64', 'json', 'plain'))
+
+_RULE_REQUIRED = frozenset(('name', 'type', 'pattern', 'action', 'enabled'))
+_RULE_TYPES = frozenset(('protocol', 'country', 'domain'))
+_RULE_ACTIONS = frozenset(('include', 'exclude'))
+
+
+def _parse_yaml(data: bytes) -> Any:
+    """Parse YAML with the libyaml-backed loader when available"""
+    # libyaml detects the encoding and decodes in C, no TextIOWrapper needed
+    return yaml.load(data, Loader=_YamlLoader)
+
+
+def _invalid(value: Any, allowed: frozenset) -> bool:
+    """True if value is not one of allowed (unhashable values never are)"""
+    try:
+        return value not in allowed
+    except TypeError:
+        return True
+
+
+def _check_source(item: Any, i: int, errs: List[str]) -> None:
+    """Validate one entry of sources.yaml, appending problems to errs"""
+    if not isinstance(item, dict):
+        errs.append(f"Source {i} must be a dictionary")
+        return
+
+    # One C-level subset test for the common case of nothing missing
+    if not item.keys() >= _SOURCE_REQUIRED:
+        if 'name' not in item:
+            errs.append(f"Source {i} missing required field: name")
+        if 'url' not in item:
+            errs.append(f"Source {i} missing required field: url")
+        if 'type' not in item:
+            errs.append(f"Source {i} missing required field: type")
+        if 'enabled' not in item:
+            errs.append(f"Source {i} missing required field: enabled")
+
+    source_type = item.get('type')
+    if _invalid(source_type, _SOURCE_TYPES):
+        errs.append(f"Source {i} has invalid type: {source_type}")
+
+
+def _check_rule(item: Any, i: int, errs: List[str]) -> None:
+    """Validate one entry of iran_rules.json, appending problems to errs"""
+    if not isinstance(item, dict):
+        errs.append(f"Rule {i} must be a dictionary")
+        return
+
+    if not item.keys() >= _RULE_REQUIRED:
+        if 'name' not in item:
+            errs.append(f"Rule {i} missing required field: name")
+        if 'type' not in item:
+            errs.append(f"Rule {i} missing required field: type")
+        if 'pattern' not in item:
+            errs.append(f"Rule {i} missing required field: pattern")
+        if 'action' not in item:
+            errs.append(f"Rule {i} missing required field: action")
+        if 'enabled' not in item:
+            errs.append(f"Rule {i} missing required field: enabled")
+
+    rule_type = item.get('type')
+    if _invalid(rule_type, _RULE_TYPES):
+        errs.append(f"Rule {i} has invalid type: {rule_type}")
+
+    action = item.get('action')
+    if _invalid(action, _RULE_ACTIONS):
+        errs.append(f"Rule {i} has invalid action: {action}")
+
+
+def _load_yaml_cached(path: Path) -> Any:
+    """Parse a YAML file, reusing a JSON sidecar while the file is unchanged"""
+    path = Path(path)
+    st = path.stat()
+    cache_path = path.with_suffix(path.suffix + '.cache.json')
+
+    try:
+        cache = json.loads(cache_path.read_bytes())
+        if cache['mtime_ns'] == st.st_mtime_ns and cache['size'] == st.st_size:
+            return cache['data']
+    except Exception:
+        # Missing, stale or unreadable sidecar: fall through and reparse
+        pass
+
+    data = _parse_yaml(path.read_bytes())
+
+    # Only cache documents that survive a JSON round trip unchanged
+    # (YAML dates or non-string keys would come back different)
+    try:
+        text = json.dumps({'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'data': data})
+        if json.loads(text)['data'] == data:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+    except (TypeError, ValueError, OSError):
+        pass
+
+    return data
+
+
+def _prefetch(paths: List[Path]) -> None:
+    """Hint the kernel to start reading files that are about to be parsed"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _parse_guard(label: str, parse_error: Type[Exception], kind: str):
+    """Report exceptions from a validate_* method as errors instead of raising
+
+    parse_error is reported as a "<kind> parse error", anything else as a
+    generic validation error; either way the method returns False.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs) -> bool:
+            try:
+                return method(self, *args, **kwargs)
+            except parse_error as e:
+                self.errors.append(f"{kind} parse error in {label}: {e}")
+            except Exception as e:
+                self.errors.append(f"Error validating {label}: {e}")
+            return False
+        return wrapper
+    return decorator
+
 
 class ConfigValidator:
     """Validates project configuration files"""
@@ -17,130 +170,137 @@ class ConfigValidator:
     def __init__(self):
         self.errors = []
         self.warnings = []
+        # (method, path) -> (st_mtime_ns, st_size, result) from earlier validate_all runs
+        self._cache: Dict[Tuple[str, Path], Tuple[int, int, Tuple[bool, List[str], List[str]]]] = {}
 
+    @_parse_guard('sources.yaml', yaml.YAMLError, 'YAML')
     def validate_sources(self, sources_file: Path) -> bool:
         """Validate sources.yaml configuration"""
-        try:
-            with open(sources_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-
-            if not config or 'sources' not in config:
-                self.errors.append("sources.yaml must contain 'sources' key")
-                return False
-
-            sources = config['sources']
-            if not isinstance(sources, list):
-                self.errors.append("sources must be a list")
-                return False
-
-            for i, source in enumerate(sources):
-                if not isinstance(source, dict):
-                    self.errors.append(f"Source {i} must be a dictionary")
-                    continue
+        config = _load_yaml_cached(sources_file)
 
-                # Check required fields
-                required = ['name', 'url', 'type', 'enabled']
-                for field in required:
-                    if field not in source:
-                        self.errors.append(f"Source {i} missing required field: {field}")
+        if not config or 'sources' not in config:
+            self.errors.append("sources.yaml must contain 'sources' key")
+            return False
 
-                # Validate type
-                if source.get('type') not in ['base64', 'json', 'plain']:
-                    self.errors.append(f"Source {i} has invalid type: {source.get('type')}")
+        sources = config['sources']
+        if not isinstance(sources, list):
+            self.errors.append("sources must be a list")
+            return False
 
-            return len(self.errors) == 0
+        errs = self.errors
+        for i, source in enumerate(sources):
+            _check_source(source, i, errs)
 
-        except yaml.YAMLError as e:
-            self.errors.append(f"YAML parse error in sources.yaml: {e}")
-            return False
-        except Exception as e:
-            self.errors.append(f"Error validating sources.yaml: {e}")
-            return False
+        return len(self.errors) == 0
 
+    # ValueError covers both json and orjson JSONDecodeError
+    @_parse_guard('iran_rules.json', ValueError, 'JSON')
     def validate_rules(self, rules_file: Path) -> bool:
         """Validate iran_rules.json configuration"""
-        try:
-            with open(rules_file, 'r', encoding='utf-8') as f:
-                rules = json.load(f)
+        rules = _json_loads(Path(rules_file).read_bytes())
 
-            if not isinstance(rules, list):
-                self.errors.append("iran_rules.json must be a list")
-                return False
+        if not isinstance(rules, list):
+            self.errors.append("iran_rules.json must be a list")
+            return False
 
-            for i, rule in enumerate(rules):
-                if not isinstance(rule, dict):
-                    self.errors.append(f"Rule {i} must be a dictionary")
-                    continue
+        errs = self.errors
+        for i, rule in enumerate(rules):
+            _check_rule(rule, i, errs)
 
-                # Check required fields
-                required = ['name', 'type', 'pattern', 'action', 'enabled']
-                for field in required:
-                    if field not in rule:
-                        self.errors.append(f"Rule {i} missing required field: {field}")
+        return len(self.errors) == 0
 
-                # Validate type
-                if rule.get('type') not in ['protocol', 'country', 'domain']:
-                    self.errors.append(f"Rule {i} has invalid type: {rule.get('type')}")
+    @_parse_guard('obfuscation_rules.yaml', yaml.YAMLError, 'YAML')
+    def validate_obfuscation(self, obfuscation_file: Path) -> bool:
+        """Validate obfuscation_rules.yaml configuration"""
+        config = _load_yaml_cached(obfuscation_file)
 
-                # Validate action
-                if rule.get('action') not in ['include', 'exclude']:
-                    self.errors.append(f"Rule {i} has invalid action: {rule.get('action')}")
+        if not config:
+            self.errors.append("obfuscation_rules.yaml is empty")
+            return False
 
-            return len(self.errors) == 0
+        if 'obfuscation_strategies' not in config:
+            self.warnings.append("obfuscation_rules.yaml missing 'obfuscation_strategies'")
+
+        return True
+
+    def validate_all(self, config_dir: Path, fail_fast: bool = False) -> bool:
+        """Validate all configuration files in config directory
+
+        With fail_fast, files are checked one at a time and validation stops
+        at the first invalid file instead of parsing the rest.
+        """
+        tasks = [
+            ('validate_sources', config_dir / 'sources.yaml'),
+            ('validate_rules', config_dir / 'iran_rules.json'),
+            ('validate_obfuscation', config_dir / 'obfuscation_rules.yaml'),
+        ]
+        # Cold starts are I/O-bound: get every read in flight before parsing
+        _prefetch([path for _, path in tasks])
+
+        if fail_fast:
+            for task in tasks:
+                if not self._merge(self._run_isolated(*task)):
+                    return False
+            return True
 
-        except json.JSONDecodeError as e:
-            self.errors.append(f"JSON parse error in iran_rules.json: {e}")
-            return False
-        except Exception as e:
-            self.errors.append(f"Error validating iran_rules.json: {e}")
-            return False
+        # The files are independent, so read and parse them concurrently
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            results = list(executor.map(lambda task: self._run_isolated(*task), tasks))
 
-    def validate_obfuscation(self, obfuscation_file: Path) -> bool:
-        """Validate obfuscation_rules.yaml configuration"""
-        try:
-            with open(obfuscation_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        all_valid = True
+        for result in results:
+            all_valid = self._merge(result) and all_valid
 
-            if not config:
-                self.errors.append("obfuscation_rules.yaml is empty")
-                return False
+        return all_valid
 
-            if 'obfuscation_strategies' not in config:
-                self.warnings.append("obfuscation_rules.yaml missing 'obfuscation_strategies'")
+    def _merge(self, result: Tuple[bool, List[str], List[str]]) -> bool:
+        """Fold an isolated validation result into this validator"""
+        valid, errors, warnings = result
+        self.errors.extend(errors)
+        self.warnings.extend(warnings)
+        return valid
 
-            return True
+    def _run_isolated(self, method: str, path: Path) -> Tuple[bool, List[str], List[str]]:
+        """Run one validate_* method on a fresh validator and return its findings
 
-        except yaml.YAMLError as e:
-            self.errors.append(f"YAML parse error in obfuscation_rules.yaml: {e}")
-            return False
-        except Exception as e:
-            self.errors.append(f"Error validating obfuscation_rules.yaml: {e}")
-            return False
+        Results are memoized per file and reused while its mtime and size
+        are unchanged.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
 
-    def validate_all(self, config_dir: Path) -> bool:
-        """Validate all configuration files in config directory"""
-        all_valid = True
+        key = (method, path)
+        if st is not None:
+            hit = self._cache.get(key)
+            if hit and hit[:2] == (st.st_mtime_ns, st.st_size):
+                return hit[2]
 
-        all_valid &= self.validate_sources(config_dir / 'sources.yaml')
-        all_valid &= self.validate_rules(config_dir / 'iran_rules.json')
-        all_valid &= self.validate_obfuscation(config_dir / 'obfuscation_rules.yaml')
+        validator = type(self)()
+        valid = getattr(validator, method)(path)
+        result = (valid, validator.errors, validator.warnings)
 
-        return all_valid
+        if st is not None:
+            self._cache[key] = (st.st_mtime_ns, st.st_size, result)
+        return result
 
     def print_report(self) -> None:
         """Print validation report"""
+        # Build the whole report first so it goes out in a single write
+        lines = []
         if self.errors:
-            print("❌ ERRORS:")
-            for error in self.errors:
-                print(f"  - {error}")
+            lines.append("❌ ERRORS:")
+            lines.extend(f"  - {error}" for error in self.errors)
 
         if self.warnings:
-            print("⚠️  WARNINGS:")
-            for warning in self.warnings:
-                print(f"  - {warning}")
+            lines.append("⚠️  WARNINGS:")
+            lines.extend(f"  - {warning}" for warning in self.warnings)
+
+        if not lines:
+            lines.append("✅ All configurations valid!")
 
-        if not self.errors and not self.warnings:
-            print("✅ All configurations valid!")
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():